@@ -3,10 +3,17 @@ import cv2
 import requests
 import numpy as np
 import pandas as pd
+import sys
 import time
+import shutil
 from datetime import datetime
 from tqdm import tqdm
 
+try:
+    import resource  # Unix only; peak memory is not reported on Windows.
+except ImportError:
+    resource = None
+
 def is_fake_image(image_url):
     """Determines if an image is fake based on multiple factors."""
     try:
@@ -17,17 +24,20 @@ def is_fake_image(image_url):
         if response.status_code != 200:
             return False, "Image Download Failed"
         
-        image_array = np.asarray(bytearray(response.content), dtype=np.uint8)
+        image_array = np.frombuffer(response.content, dtype=np.uint8)
         image = cv2.imdecode(image_array, cv2.IMREAD_COLOR)
+        del response, image_array
         
         if image is None:
             return False, "Unable to Decode Image"
 
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+        laplacian_var = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_32F))[1][0, 0] ** 2
         
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        brightness = np.mean(hsv[:, :, 2])
+        # HSV value channel is max(B, G, R); build it in one plane instead of a full HSV image.
+        value = np.maximum(image[:, :, 0], image[:, :, 1])
+        np.maximum(value, image[:, :, 2], out=value)
+        brightness = cv2.mean(value)[0]
         
         if laplacian_var < 50:
             return True, "Blurry Image"
@@ -66,43 +76,53 @@ def process_attendance(file_path):
             print("❌ Error: Required columns missing in the input file.")
             return
         
-        fake_records = []
-        log_data = []
-        
-        for _, row in tqdm(df.iterrows(), total=len(df), desc="Processing", unit="record"):
-            rider_id = row['Rider ID']
-            image_url = row.get('Image URL', None)
-            is_fake, reason = is_fake_image(image_url)
-            log_data.append(f"Rider ID: {rider_id} | {reason}")
-            
-            if is_fake:
-                row['Detection Reason'] = reason
-                fake_records.append(row.to_dict())
-        
         today_date = datetime.now().strftime('%Y-%m-%d')
         folder_name = create_unique_folder(f"fake_attendance_{today_date}")
+        log_file = os.path.join(folder_name, f"detection_log_{today_date}.txt")
         
-        if fake_records:
-            save_fake_attendance(fake_records, folder_name)
+        fake_positions = []
+        fake_reasons = []
+        
+        try:
+            with open(log_file, "w") as log:
+                separator = ""
+                rows = enumerate(zip(df['Rider ID'], df['Image URL']))
+                for position, (rider_id, image_url) in tqdm(rows, total=len(df), desc="Processing", unit="record"):
+                    is_fake, reason = is_fake_image(image_url)
+                    log.write(f"{separator}Rider ID: {rider_id} | {reason}")
+                    separator = "\n"
+                    
+                    if is_fake:
+                        fake_positions.append(position)
+                        fake_reasons.append(reason)
+        except BaseException:
+            # Don't leave a half-written report folder behind on failure or Ctrl+C.
+            shutil.rmtree(folder_name, ignore_errors=True)
+            raise
+        
+        if fake_positions:
+            df_fake = df.iloc[fake_positions].assign(**{'Detection Reason': fake_reasons})
+            save_fake_attendance(df_fake, folder_name)
             print(f"✅ Fake attendance detected. Report saved in {folder_name}.")
         else:
             print("✅ No fake images detected.")
         
-        log_file = os.path.join(folder_name, f"detection_log_{today_date}.txt")
-        with open(log_file, "w") as f:
-            f.write("\n".join(log_data))
         print(f"📂 Detection log saved: {log_file}")
         
         print(f"⏳ Total processing time: {round(time.time() - start_time, 2)} seconds.")
+        if resource is not None:
+            # ru_maxrss is in bytes on macOS and KiB on Linux.
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            peak_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+            print(f"📈 Peak memory usage: {round(peak_mb, 1)} MB.")
     except Exception as e:
         print(f"Error: {e}")
 
-def save_fake_attendance(fake_records, folder_name):
+def save_fake_attendance(df_fake, folder_name):
     """Saves detected fake attendance records to an Excel file."""
     try:
         file_name = f"fake_rider_attendance_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
         output_path = os.path.join(folder_name, file_name)
-        df_fake = pd.DataFrame(fake_records)
         df_fake.to_excel(output_path, index=False)
         print(f"📂 Report saved: {output_path}")
     except Exception as e: